@@ -1,3 +1,29 @@
 
-from .open_safer import open_safer
-from .open_dir_safer import open_dir_safer
+import sys
+
+__all__ = ["open_safer", "open_dir_safer"]
+
+class _Package (type(sys)):
+
+  def __setattr__ (self, name:str, value):
+    #サブモジュールと関数が同名のため、サブモジュールの読み込み時に
+    #パッケージの属性がモジュールで上書きされないよう関数に置き換えます。
+    if name in __all__ and isinstance(value, type(sys)):
+      value = getattr(value, name)
+    super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = _Package
+
+def __getattr__ (name:str):
+  #起動時間を短く保つため、サブモジュールは初めて参照された時点で読み込まれます。
+  if name == "open_safer":
+    from .open_safer import open_safer as value
+  elif name == "open_dir_safer":
+    from .open_dir_safer import open_dir_safer as value
+  else:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  globals()[name] = value
+  return value
+
+def __dir__ ():
+  return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,34 @@
+
+import abc
+import typing
+
+class ICloseable (abc.ABC):
+
+  @abc.abstractmethod
+  def close (self, succeeded:bool=True):
+    pass
+
+  @property
+  @abc.abstractmethod
+  def closed (self) -> bool:
+    pass
+
+class Closeable:
+
+  """`closeable` パッケージが導入されていない場合に使用される `Closeable` の代替実装です。
+
+  初回の `close` 呼び出し時にのみ `on_close` を呼び出し、以降の呼び出しは無視されます。
+  """
+
+  def __init__ (self, on_close:typing.Callable[[bool], typing.Any]):
+    self._on_close = on_close
+    self._closed = False
+
+  def close (self, succeeded:bool=True):
+    if not self._closed:
+      self._closed = True
+      return self._on_close(succeeded)
+
+  @property
+  def closed (self) -> bool:
+    return self._closed
@@ -0,0 +1,139 @@
+
+import os
+import errno
+import shutil
+import stat as _stat
+
+_IGNORED_XATTR_ERRNOS = (errno.EPERM, errno.EACCES, errno.ENOTSUP, errno.ENODATA, errno.EINVAL)
+
+class _Metadata:
+
+  def __init__ (self, mode:int, uid:int, gid:int, xattrs:dict[str, bytes], *, atime_ns:int=0, mtime_ns:int=0):
+    self._mode = mode
+    self._uid = uid
+    self._gid = gid
+    self._xattrs = xattrs
+    self._atime_ns = atime_ns
+    self._mtime_ns = mtime_ns
+
+  @classmethod
+  def capture (cls, target:int|os.PathLike|str) -> "_Metadata":
+
+    """ファイル記述子あるいはパスからメタデータを一度の `stat` `listxattr` で取得します。
+
+    Parameters
+    ----------
+    target : int|os.PathLike|str
+      メタデータを取得するファイル記述子、あるいはパスです。
+
+    Returns
+    -------
+    _Metadata
+      取得されたメタデータです。
+    """
+
+    st = os.stat(target)
+    xattrs = {}
+    if hasattr(os, "listxattr"):
+      try:
+        names = os.listxattr(target)
+      except OSError as error:
+        if error.errno not in _IGNORED_XATTR_ERRNOS:
+          raise
+        names = []
+      for name in names:
+        try:
+          xattrs[name] = os.getxattr(target, name)
+        except OSError as error:
+          if error.errno not in _IGNORED_XATTR_ERRNOS:
+            raise
+    return cls(_stat.S_IMODE(st.st_mode), st.st_uid, st.st_gid, xattrs, atime_ns=st.st_atime_ns, mtime_ns=st.st_mtime_ns)
+
+  def apply (self, fd:int, *, times:bool=False):
+
+    """取得済みのメタデータをファイル記述子に適用します。
+
+    所有者の変更が許可されていない場合や、拡張属性が対応していないファイルシステムの場合、
+    その項目の適用は無視されます。
+
+    Parameters
+    ----------
+    fd : int
+      メタデータを適用するファイル記述子です。
+    times : bool
+      本引数が `True` ならばアクセス・更新日時も一緒に適用します。
+    """
+
+    #fchown は setuid/setgid ビットを落とすため fchmod より先に行います。
+    if hasattr(os, "fchown"):
+      try:
+        os.fchown(fd, self._uid, self._gid)
+      except PermissionError:
+        pass
+    if hasattr(os, "fchmod"):
+      os.fchmod(fd, self._mode)
+    for name, value in self._xattrs.items():
+      try:
+        os.setxattr(fd, name, value)
+      except OSError as error:
+        if error.errno not in _IGNORED_XATTR_ERRNOS:
+          raise
+    if times and os.utime in os.supports_fd:
+      os.utime(fd, ns=(self._atime_ns, self._mtime_ns))
+
+  @property
+  def mode (self) -> int:
+    return self._mode
+
+  @property
+  def uid (self) -> int:
+    return self._uid
+
+  @property
+  def gid (self) -> int:
+    return self._gid
+
+  @property
+  def xattrs (self) -> dict[str, bytes]:
+    return self._xattrs
+
+  @property
+  def atime_ns (self) -> int:
+    return self._atime_ns
+
+  @property
+  def mtime_ns (self) -> int:
+    return self._mtime_ns
+
+def _copy_preserve (src:str, dst:str) -> str:
+  with open(src, "rb") as input_file, open(dst, "wb") as output_file:
+    metadata = _Metadata.capture(input_file.fileno())
+    shutil.copyfileobj(input_file, output_file)
+    output_file.flush()
+    metadata.apply(output_file.fileno(), times=True)
+  return dst
+
+def _apply_dir_metadata (path:str|os.PathLike, metadata:_Metadata):
+  fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+  try:
+    metadata.apply(fd, times=True)
+  finally:
+    os.close(fd)
+
+def _copy_tree_preserve (src:str|os.PathLike, dst:str|os.PathLike):
+  #ディレクトリのパーミッションによって子要素の複製が妨げられないように、
+  #ディレクトリ自身のメタデータは子要素を複製し終えた後に適用します。
+  #`dst` 自身へのメタデータの適用は呼び出し側で行います。
+  with os.scandir(src) as entries:
+    for entry in entries:
+      entry_dst = os.path.join(dst, entry.name)
+      if entry.is_dir():
+        metadata = _Metadata.capture(entry.path)
+        os.mkdir(entry_dst)
+        _copy_tree_preserve(entry.path, entry_dst)
+        _apply_dir_metadata(entry_dst, metadata)
+      elif entry.is_file():
+        _copy_preserve(entry.path, entry_dst)
+      else:
+        #名前付きパイプ等を開くと処理が停止するため `shutil.copyfile` と同様に例外を送出します。
+        raise shutil.SpecialFileError(f"`{entry.path}` is not a regular file")
@@ -2,16 +2,27 @@
 import shutil
 import tempfile
 from pathlib import Path
-from closeable import ICloseable, Closeable
+try:
+  from closeable import ICloseable, Closeable
+except ImportError:
+  from ._closeable import ICloseable, Closeable
+from .metadata import _Metadata, _apply_dir_metadata, _copy_tree_preserve
 
 class _OpenDirSafer (ICloseable):
 
-  def __init__ (self, path:Path, temp_dir:tempfile.TemporaryDirectory):
+  def __init__ (self, path:Path, temp_dir:tempfile.TemporaryDirectory, *, metadata:_Metadata|None=None):
     self._path = path
     self._temp_dir = temp_dir
+    self._metadata = metadata
     self._closeable = Closeable(self._on_close)
 
   def _on_close (self, succeeded:bool):
+    try:
+      if succeeded and self._metadata is not None:
+        _apply_dir_metadata(self._temp_dir.name, self._metadata)
+    except BaseException:
+      self._temp_dir.cleanup()
+      raise
     if succeeded:
       try:
         shutil.rmtree(self._path)
@@ -36,13 +47,17 @@ class _OpenDirSafer (ICloseable):
   def temp_dir (self) -> tempfile.TemporaryDirectory:
     return self._temp_dir
 
+  @property
+  def metadata (self) -> _Metadata|None:
+    return self._metadata
+
   def __enter__ (self):
     return Path(self._temp_dir.name)
 
   def __exit__ (self, exc_type, exc_value, traceback):
     self.close((exc_type is None and exc_value is None and traceback is None))
 
-def open_dir_safer (path:Path|str) -> _OpenDirSafer:
+def open_dir_safer (path:Path|str, *, preserve:bool=False) -> _OpenDirSafer:
 
   """指定されたディレクトリを安全に作成します。
 
@@ -66,6 +81,9 @@ def open_dir_safer (path:Path|str) -> _OpenDirSafer:
   ----------
   path : Path|str
     作成するディレクトリのパスです。
+  preserve : bool
+    本引数が `True` ならば既存のファイル・ディレクトリを複製する際に、
+    パーミッション・所有者・拡張属性(ACL を含む)・アクセス・更新日時も一緒に複製します。
 
   Returns
   -------
@@ -75,13 +93,22 @@ def open_dir_safer (path:Path|str) -> _OpenDirSafer:
 
   temp_dir = tempfile.TemporaryDirectory(delete=False)
   p = Path(path)
+  metadata = None
   try:
-    for f in p.iterdir():
-      fdst = Path(temp_dir.name).joinpath(f.relative_to(p))
-      if f.is_dir():
-        shutil.copytree(f, fdst)
-      else:
-        shutil.copy(f, fdst)
+    if preserve:
+      #対象ディレクトリ自身のメタデータは置換の直前に適用します。
+      metadata = _Metadata.capture(p)
+      _copy_tree_preserve(p, temp_dir.name)
+    else:
+      for f in p.iterdir():
+        fdst = Path(temp_dir.name).joinpath(f.relative_to(p))
+        if f.is_dir():
+          shutil.copytree(f, fdst)
+        else:
+          shutil.copy(f, fdst)
   except FileNotFoundError:
     pass
-  return _OpenDirSafer(p, temp_dir)
+  except BaseException:
+    temp_dir.cleanup()
+    raise
+  return _OpenDirSafer(p, temp_dir, metadata=metadata)
@@ -1,19 +1,49 @@
 
+import os
+import errno
 import shutil
 import typing
 import tempfile
 from pathlib import Path
-from closeable import ICloseable, Closeable
+try:
+  from closeable import ICloseable, Closeable
+except ImportError:
+  from ._closeable import ICloseable, Closeable
+from .metadata import _Metadata
+
+def _get_iov_max () -> int:
+  try:
+    return os.sysconf("SC_IOV_MAX")
+  except (AttributeError, ValueError, OSError):
+    return 1024
+
+_IOV_MAX = _get_iov_max()
+
+def _nbytes (buffer) -> int:
+  if isinstance(buffer, (bytes, bytearray)):
+    return len(buffer)
+  return memoryview(buffer).nbytes
+
+_COPY_FALLBACK_ERRNOS = (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK)
 
 class _OpenSafer (ICloseable):
 
-  def __init__ (self, path:Path, temp_file, *, make_dir:bool):
+  def __init__ (self, path:Path, temp_file, *, make_dir:bool, metadata:_Metadata|None=None):
     self._path = path
     self._temp_file = temp_file
     self._make_dir = make_dir
+    self._metadata = metadata
     self._closeable = Closeable(self._on_close)
 
   def _on_close (self, succeeded:bool):
+    try:
+      if succeeded and self._metadata is not None:
+        self._temp_file.flush()
+        self._metadata.apply(self._temp_file.fileno())
+    except BaseException:
+      self._temp_file.close()
+      Path(self._temp_file.name).unlink()
+      raise
     self._temp_file.close()
     if succeeded:
       if self._make_dir:
@@ -25,6 +55,99 @@ class _OpenSafer (ICloseable):
   def close (self, succeeded:bool=True):
     return self._closeable.close(succeeded)
 
+  def writev (self, buffers:typing.Iterable[bytes]) -> int:
+
+    """複数のバッファを `os.writev` でまとめて一時ファイルに書き込みます。
+
+    Parameters
+    ----------
+    buffers : typing.Iterable[bytes]
+      書き込むバッファの列です。
+
+    Returns
+    -------
+    int
+      書き込まれたバイト数です。
+    """
+
+    buffers = list(buffers)
+    if not hasattr(os, "writev"):
+      #os.writev が利用できない環境では、ファイルオブジェクトを経由して順に書き込みます。
+      file = getattr(self._temp_file, "buffer", self._temp_file)
+      self._temp_file.flush()
+      total = sum(file.write(buffer) for buffer in buffers)
+      file.flush()
+      return total
+    fd = self._begin_raw_write()
+    total = 0
+    index = 0
+    try:
+      while index < len(buffers):
+        size = os.writev(fd, buffers[index:index + _IOV_MAX])
+        total += size
+        while index < len(buffers):
+          nbytes = _nbytes(buffers[index])
+          if size < nbytes:
+            break
+          size -= nbytes
+          index += 1
+        if size:
+          buffers[index] = memoryview(buffers[index]).cast("B")[size:]
+    finally:
+      self._end_raw_write()
+    return total
+
+  def write_from (self, source, offset:int, length:int) -> int:
+
+    """別ファイルの指定範囲をユーザ空間への複製なしに一時ファイルへ書き込みます。
+
+    `os.copy_file_range` `os.sendfile` の順に利用可能なものを試し、
+    どちらも利用できない場合は `os.pread` (利用できなければ `os.lseek` `os.read`) による読み書きで代替します。
+
+    Parameters
+    ----------
+    source : int|typing.IO
+      読み込み元のファイル記述子、あるいは `fileno` を持つファイルオブジェクトです。
+    offset : int
+      読み込み元のファイルにおける読み込み開始位置です。
+    length : int
+      書き込む最大のバイト数です。
+
+    Returns
+    -------
+    int
+      書き込まれたバイト数です。読み込み元が終端に達した場合は `length` より小さくなります。
+    """
+
+    src_fd = source if isinstance(source, int) else source.fileno()
+    fd = self._begin_raw_write()
+    methods = _get_copy_methods()
+    total = 0
+    try:
+      while total < length:
+        try:
+          size = methods[0](src_fd, fd, offset + total, length - total)
+        except OSError as error:
+          #この組み合わせでは利用できない方法ならば、以降は次の方法で処理を続けます。
+          if error.errno in _COPY_FALLBACK_ERRNOS and 1 < len(methods):
+            methods.pop(0)
+            continue
+          raise
+        if size == 0:
+          break
+        total += size
+    finally:
+      self._end_raw_write()
+    return total
+
+  def _begin_raw_write (self) -> int:
+    self._temp_file.flush()
+    return self._temp_file.fileno()
+
+  def _end_raw_write (self):
+    #ファイル記述子への直接の書き込みで進んだ位置をファイルオブジェクトに反映させます。
+    self._temp_file.seek(0, os.SEEK_CUR)
+
   @property
   def closed (self) -> bool:
     return self._closeable.closed
@@ -41,13 +164,45 @@ class _OpenSafer (ICloseable):
   def make_dir (self) -> bool:
     return self._make_dir
 
+  @property
+  def metadata (self) -> _Metadata|None:
+    return self._metadata
+
   def __enter__ (self):
     return self._temp_file
 
   def __exit__ (self, exc_type, exc_value, traceback):
     self.close((exc_type is None and exc_value is None and traceback is None))
 
-def open_safer (path:Path|str, mode:str, *, make_dir:bool=False, buffering:int=-1, encoding:str|None=None, errors:str|None=None, newline:str|None=None) -> _OpenSafer|typing.IO:
+def _copy_by_copy_file_range (src_fd:int, dst_fd:int, offset:int, length:int) -> int:
+  return os.copy_file_range(src_fd, dst_fd, length, offset)
+
+def _copy_by_sendfile (src_fd:int, dst_fd:int, offset:int, length:int) -> int:
+  return os.sendfile(dst_fd, src_fd, offset, length)
+
+def _copy_by_pread (src_fd:int, dst_fd:int, offset:int, length:int) -> int:
+  data = os.pread(src_fd, min(length, shutil.COPY_BUFSIZE), offset)
+  return os.write(dst_fd, data)
+
+def _copy_by_read (src_fd:int, dst_fd:int, offset:int, length:int) -> int:
+  os.lseek(src_fd, offset, os.SEEK_SET)
+  data = os.read(src_fd, min(length, shutil.COPY_BUFSIZE))
+  return os.write(dst_fd, data)
+
+def _get_copy_methods () -> list[typing.Callable[[int, int, int, int], int]]:
+  #最後の方法はどの環境でも利用できるため、候補が空になることはありません。
+  methods = []
+  if hasattr(os, "copy_file_range"):
+    methods.append(_copy_by_copy_file_range)
+  if hasattr(os, "sendfile"):
+    methods.append(_copy_by_sendfile)
+  if hasattr(os, "pread"):
+    methods.append(_copy_by_pread)
+  else:
+    methods.append(_copy_by_read)
+  return methods
+
+def open_safer (path:Path|str, mode:str, *, make_dir:bool=False, preserve:bool=False, buffering:int=-1, encoding:str|None=None, errors:str|None=None, newline:str|None=None) -> _OpenSafer|typing.IO:
 
   """指定されたファイルを比較的安全に作成します。
 
@@ -81,6 +236,9 @@ def open_safer (path:Path|str, mode:str, *, make_dir:bool=False, buffering:int=-
     本引数に排他・読み込みモードが指定された場合、本関数は処理を `open` 関数に移譲して終了します。
   make_dir : bool
     本引数が `True` ならばファイルが置換される際に、親ディレクトリも一緒に作成されます。
+  preserve : bool
+    本引数が `True` ならば対象ファイルのパーミッション・所有者・拡張属性(ACL を含む)を
+    置換前の一時ファイルに適用します。対象ファイルが存在しない場合は何も行いません。
   buffering : int
     `open` `tempfile.NamedTemporaryFile` 関数に渡される値です。
   encoding : str|None
@@ -97,6 +255,13 @@ def open_safer (path:Path|str, mode:str, *, make_dir:bool=False, buffering:int=-
     `mode` でそれ以外のモードが指定された場合に `_OpenSafer` が返されます。
   """
 
+  #一時ファイルを作成する前に取得し、取得に失敗しても一時ファイルが残らないようにします。
+  metadata = None
+  if preserve:
+    try:
+      metadata = _Metadata.capture(path)
+    except FileNotFoundError:
+      pass
   if "w" in mode:
     temp_file = tempfile.NamedTemporaryFile(
       mode, 
@@ -170,4 +335,4 @@ def open_safer (path:Path|str, mode:str, *, make_dir:bool=False, buffering:int=-
     )
   else:
     raise ValueError()
-  return _OpenSafer(Path(path), temp_file, make_dir=make_dir)
+  return _OpenSafer(Path(path), temp_file, make_dir=make_dir, metadata=metadata)
@@ -0,0 +1,69 @@
+
+import os
+import time
+import pytest
+import shutil
+import opensafer
+from pathlib import Path
+from opensafer.metadata import _Metadata
+
+#本ファイルのテストは既定では実行されません。`pytest -m benchmark -s` で実行してください。
+
+pytestmark = pytest.mark.benchmark
+
+TEST_DIR = Path("./.test/benchmark")
+FILE_COUNT = 1000
+
+def setup_function (func):
+  TEST_DIR.mkdir(parents=True, exist_ok=True)
+
+def teardown_function (func):
+  shutil.rmtree(TEST_DIR)
+
+def _report (name:str, elapsed:float, count:int):
+  print(f"{name}: {elapsed / count * 1e6:.1f} us/file")
+
+def test_benchmark_metadata ():
+
+  #一ファイルあたりのメタデータの取得・適用に掛かる時間を計測します。
+
+  path = TEST_DIR.joinpath("sample.txt")
+  with open(path, "w") as file:
+    file.write("abc")
+  fd = os.open(path, os.O_RDONLY)
+  try:
+    start = time.perf_counter()
+    for _ in range(FILE_COUNT):
+      _Metadata.capture(fd).apply(fd)
+    _report("capture+apply", time.perf_counter() - start, FILE_COUNT)
+  finally:
+    os.close(fd)
+
+def test_benchmark_open_safer ():
+
+  #preserve の有無による open_safer 一回あたりの時間の差を計測します。
+
+  path = TEST_DIR.joinpath("sample.txt")
+  with open(path, "w") as file:
+    file.write("abc")
+  for preserve in (False, True):
+    start = time.perf_counter()
+    for _ in range(FILE_COUNT):
+      with opensafer.open_safer(path, "w", preserve=preserve) as file:
+        file.write("abc")
+    _report(f"open_safer(preserve={preserve})", time.perf_counter() - start, FILE_COUNT)
+
+def test_benchmark_open_dir_safer ():
+
+  #preserve の有無による open_dir_safer のディレクトリ木の複製時間の差を計測します。
+
+  for i in range(FILE_COUNT):
+    d = TEST_DIR.joinpath(f"{i % 10}")
+    d.mkdir(exist_ok=True)
+    with open(d.joinpath(f"{i}.txt"), "w") as file:
+      file.write("abc")
+  for preserve in (False, True):
+    start = time.perf_counter()
+    with opensafer.open_dir_safer(TEST_DIR, preserve=preserve):
+      pass
+    _report(f"open_dir_safer(preserve={preserve})", time.perf_counter() - start, FILE_COUNT)
@@ -0,0 +1,66 @@
+
+import os
+import sys
+import pytest
+import subprocess
+
+def _run_python (*args:str) -> subprocess.CompletedProcess:
+  env = dict(os.environ)
+  env["PYTHONPATH"] = os.pathsep.join(sys.path)
+  return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+
+def test_import_lazy ():
+
+  #パッケージの読み込み時点ではサブモジュールとその依存モジュールは読み込まれません。
+
+  result = _run_python("-c", "import sys, opensafer; print(' '.join(sorted(sys.modules)))")
+  modules = result.stdout.split()
+  assert "opensafer" in modules
+  for name in ("opensafer.open_safer", "opensafer.open_dir_safer", "shutil", "tempfile", "closeable"):
+    assert name not in modules
+
+  #属性が参照された時点でサブモジュールが読み込まれます。
+
+  result = _run_python("-c", "import opensafer; print(opensafer.open_safer.__module__, opensafer.open_dir_safer.__module__)")
+  assert result.stdout.split() == ["opensafer.open_safer", "opensafer.open_dir_safer"]
+
+def test_import_submodule ():
+
+  #サブモジュールを先に読み込んだ場合でも、パッケージの属性は関数のままです。
+
+  result = _run_python("-c", "import opensafer.open_safer, opensafer; print(callable(opensafer.open_safer))")
+  assert result.stdout.split() == ["True"]
+  result = _run_python("-c", "from opensafer.open_dir_safer import _OpenDirSafer; import opensafer; print(callable(opensafer.open_dir_safer))")
+  assert result.stdout.split() == ["True"]
+
+IMPORT_TIME_MARGIN = 5000 #us
+
+def _import_times (statement:str) -> dict[str, int]:
+  #-X importtime の出力を、モジュール名と自身の読み込み時間の辞書に変換します。
+  result = _run_python("-X", "importtime", "-c", statement)
+  times = {}
+  for line in result.stderr.splitlines():
+    fields = [field.strip() for field in line.removeprefix("import time:").split("|")]
+    if len(fields) == 3 and fields[0].isdigit():
+      times[fields[2].strip()] = int(fields[0])
+  return times
+
+def test_import_modules ():
+
+  #インタプリタの起動時に読み込まれるモジュールを除き、
+  #パッケージの読み込みで追加されるモジュールはパッケージ自身のみです。
+
+  baseline = _import_times("import sys")
+  modules = _import_times("import opensafer")
+  assert set(modules) - set(baseline) == {"opensafer"}
+
+@pytest.mark.benchmark
+def test_import_time ():
+
+  #-X importtime の出力から、パッケージの読み込みによって増える時間が
+  #同じ実行環境でのインタプリタ単体の起動と比べて一定の範囲内に収まることを確認します。
+
+  baseline = min(sum(_import_times("import sys").values()) for _ in range(5))
+  lazy = min(sum(_import_times("import opensafer").values()) for _ in range(5))
+  print(f"import sys: {baseline} us, import opensafer: {lazy} us")
+  assert lazy - baseline < IMPORT_TIME_MARGIN
@@ -1,4 +1,5 @@
 
+import os
 import pytest
 import shutil
 import opensafer
@@ -45,3 +46,75 @@ def test_open_dir_safer3 ():
 
   with open(TEST_DIR.joinpath("sample.txt"), "r") as file:
     assert file.read() == "abc123"
+
+def test_open_dir_safer_preserve ():
+
+  #既に内容物が存在するディレクトリを指定した場合の動作確認(既存のファイルはパーミッションごと複製されます)
+
+  with open(TEST_DIR.joinpath("sample.txt"), "w") as file:
+    file.write("abc")
+  TEST_DIR.joinpath("sample.txt").chmod(0o640)
+  TEST_DIR.chmod(0o750)
+
+  with opensafer.open_dir_safer(TEST_DIR, preserve=True) as d:
+    with open(d.joinpath("sample.txt"), "a") as file:
+      file.write("123")
+
+  assert TEST_DIR.stat().st_mode & 0o777 == 0o750
+  assert TEST_DIR.joinpath("sample.txt").stat().st_mode & 0o777 == 0o640
+  with open(TEST_DIR.joinpath("sample.txt"), "r") as file:
+    assert file.read() == "abc123"
+
+def test_open_dir_safer_preserve2 ():
+
+  #入れ子になったファイル・ディレクトリもパーミッション・更新日時ごと複製されます。
+
+  TEST_DIR.joinpath("nested").mkdir()
+  with open(TEST_DIR.joinpath("nested/sample.txt"), "w") as file:
+    file.write("abc")
+  os.utime(TEST_DIR.joinpath("nested/sample.txt"), (1000000, 1000000))
+  TEST_DIR.joinpath("nested").chmod(0o750)
+  os.utime(TEST_DIR.joinpath("nested"), (2000000, 2000000))
+
+  with opensafer.open_dir_safer(TEST_DIR, preserve=True) as d:
+    pass
+
+  assert TEST_DIR.joinpath("nested").stat().st_mode & 0o777 == 0o750
+  assert TEST_DIR.joinpath("nested").stat().st_mtime == 2000000
+  assert TEST_DIR.joinpath("nested/sample.txt").stat().st_mtime == 1000000
+  with open(TEST_DIR.joinpath("nested/sample.txt"), "r") as file:
+    assert file.read() == "abc"
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="os.mkfifo is not available.")
+def test_open_dir_safer_preserve3 ():
+
+  #名前付きパイプが含まれている場合は処理を停止せずに例外が送出されます。
+
+  os.mkfifo(TEST_DIR.joinpath("pipe"))
+
+  with pytest.raises(shutil.SpecialFileError):
+    with opensafer.open_dir_safer(TEST_DIR, preserve=True) as d:
+      pass
+
+def test_open_dir_safer_preserve4 ():
+
+  #対象ディレクトリ自身のメタデータは置換の直前に適用されるため、
+  #読み込み専用のディレクトリでも with コンテキスト中に書き込めます。
+
+  with open(TEST_DIR.joinpath("sample.txt"), "w") as file:
+    file.write("abc")
+  os.utime(TEST_DIR, (3000000, 3000000))
+  TEST_DIR.chmod(0o555)
+
+  try:
+    with opensafer.open_dir_safer(TEST_DIR, preserve=True) as d:
+      assert d.stat().st_mode & 0o777 != 0o555
+      with open(d.joinpath("sample2.txt"), "w") as file:
+        file.write("123")
+
+    assert TEST_DIR.stat().st_mode & 0o777 == 0o555
+    assert TEST_DIR.stat().st_mtime == 3000000
+    with open(TEST_DIR.joinpath("sample2.txt"), "r") as file:
+      assert file.read() == "123"
+  finally:
+    TEST_DIR.chmod(0o755)
@@ -1,5 +1,7 @@
 
 import io
+import os
+import errno
 import pytest
 import shutil
 import opensafer
@@ -403,3 +405,192 @@ def test_open_safer_error ():
   with pytest.raises(ValueError):
     with opensafer.open_safer(TEST_FILE, "1") as file:
       pass
+
+#まとめて書き込む機能の動作確認
+
+def test_open_safer_writev ():
+
+  safer = opensafer.open_safer(TEST_FILE, "wb")
+  with safer as file:
+    assert file.write(b"abc") == 3
+    assert safer.writev([b"123", bytearray(b"456"), memoryview(b"789")]) == 9
+    assert file.write(b"def") == 3
+
+  #一時ファイルへの変更が対象ファイルに適切に反映されたかを確認します。
+
+  with open(TEST_FILE, "rb") as file:
+    assert file.read() == b"abc123456789def"
+
+def test_open_safer_write_from ():
+
+  with open(TEST_FILE, "wb") as file:
+    file.write(b"0123456789")
+
+  safer = opensafer.open_safer(TEST_FILE, "wb")
+  with safer as file:
+    with open(TEST_FILE, "rb") as input_file:
+      assert safer.write_from(input_file, 2, 3) == 3
+      assert file.write(b"-") == 1
+      assert safer.write_from(input_file.fileno(), 0, 2) == 2
+
+      #読み込み元の終端に達した場合は書き込めた分のバイト数が返されます。
+
+      assert safer.write_from(input_file, 8, 100) == 2
+
+  #一時ファイルへの変更が対象ファイルに適切に反映されたかを確認します。
+
+  with open(TEST_FILE, "rb") as file:
+    assert file.read() == b"234-0189"
+
+def test_open_safer_writev2 ():
+
+  #IOV_MAX を超える数のバッファもまとめて書き込めます。
+
+  buffers = [b"%05d" % i for i in range(10000)]
+  safer = opensafer.open_safer(TEST_FILE, "wb")
+  with safer as file:
+    assert safer.writev(buffers) == 50000
+
+  with open(TEST_FILE, "rb") as file:
+    assert file.read() == b"".join(buffers)
+
+@pytest.mark.skipif(not hasattr(os, "copy_file_range"), reason="os.copy_file_range is not available.")
+def test_open_safer_write_from2 (monkeypatch):
+
+  with open(TEST_FILE, "wb") as file:
+    file.write(b"0123456789")
+
+  #利用できない方法は一度だけ試され、以降は次の方法で処理が続けられます。
+
+  calls = []
+  def copy_file_range (*args):
+    calls.append(args)
+    raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+  monkeypatch.setattr(os, "copy_file_range", copy_file_range)
+
+  safer = opensafer.open_safer(TEST_FILE, "wb")
+  with safer as file:
+    with open(TEST_FILE, "rb") as input_file:
+      assert safer.write_from(input_file, 0, 10) == 10
+  assert len(calls) == 1
+
+  with open(TEST_FILE, "rb") as file:
+    assert file.read() == b"0123456789"
+
+  #それ以外のエラーは代替されずに送出されます。
+
+  def copy_file_range2 (*args):
+    raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+  monkeypatch.setattr(os, "copy_file_range", copy_file_range2)
+
+  with pytest.raises(OSError) as error:
+    safer = opensafer.open_safer(TEST_FILE, "wb")
+    with safer as file:
+      with open(TEST_FILE, "rb") as input_file:
+        safer.write_from(input_file, 0, 10)
+  assert error.value.errno == errno.ENOSPC
+
+def test_open_safer_write_from3 (monkeypatch):
+
+  with open(TEST_FILE, "wb") as file:
+    file.write(b"0123456789")
+
+  #sendfile が通常のファイルに使えない環境(ENOTSOCK)では pread による読み書きで代替されます。
+
+  def sendfile (*args):
+    raise OSError(errno.ENOTSOCK, os.strerror(errno.ENOTSOCK))
+  monkeypatch.delattr(os, "copy_file_range", raising=False)
+  monkeypatch.setattr(os, "sendfile", sendfile)
+
+  safer = opensafer.open_safer(TEST_FILE, "wb")
+  with safer as file:
+    with open(TEST_FILE, "rb") as input_file:
+      assert safer.write_from(input_file, 2, 5) == 5
+
+  with open(TEST_FILE, "rb") as file:
+    assert file.read() == b"23456"
+
+  #いずれのシステムコールも存在しない環境では lseek と read による読み書きで代替されます。
+
+  monkeypatch.delattr(os, "sendfile")
+  monkeypatch.delattr(os, "pread", raising=False)
+
+  safer = opensafer.open_safer(TEST_FILE, "wb")
+  with safer as file:
+    with open(TEST_FILE, "rb") as input_file:
+      assert safer.write_from(input_file, 1, 3) == 3
+
+  with open(TEST_FILE, "rb") as file:
+    assert file.read() == b"345"
+
+def test_open_safer_writev3 (monkeypatch):
+
+  #os.writev が存在しない環境ではファイルオブジェクトを経由して書き込まれます。
+
+  monkeypatch.delattr(os, "writev", raising=False)
+
+  safer = opensafer.open_safer(TEST_FILE, "wb")
+  with safer as file:
+    assert file.write(b"abc") == 3
+    assert safer.writev([b"123", bytearray(b"456")]) == 6
+    assert file.write(b"def") == 3
+
+  with open(TEST_FILE, "rb") as file:
+    assert file.read() == b"abc123456def"
+
+  safer = opensafer.open_safer(TEST_FILE, "w")
+  with safer as file:
+    assert file.write("abc") == 3
+    assert safer.writev([b"123"]) == 3
+    assert file.write("def") == 3
+
+  with open(TEST_FILE, "r") as file:
+    assert file.read() == "abc123def"
+
+#メタデータの保存の動作確認
+
+def test_open_safer_preserve ():
+
+  TEST_FILE.chmod(0o640)
+
+  with opensafer.open_safer(TEST_FILE, "w", preserve=True) as file:
+    assert file.write("123") == 3
+
+  #対象ファイルのパーミッションが一時ファイルを経由しても保たれているかを確認します。
+
+  assert TEST_FILE.stat().st_mode & 0o777 == 0o640
+  with open(TEST_FILE, "r") as file:
+    assert file.read() == "123"
+
+  #存在しないファイルが指定されたならば一時ファイルのパーミッションがそのまま使われます。
+
+  with opensafer.open_safer(TEST_FILE.with_stem("unexists.txt"), "w", preserve=True) as file:
+    assert file.write("123") == 3
+
+  assert TEST_FILE.with_stem("unexists.txt").stat().st_mode & 0o777 == 0o600
+
+def test_open_safer_preserve2 (monkeypatch, tmp_path):
+
+  #一時ファイルの作成先を監視できるように一時ディレクトリを差し替えます。
+
+  import tempfile
+  monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+  #メタデータの取得に失敗した場合、一時ファイルは作成されません。
+
+  with pytest.raises(NotADirectoryError):
+    opensafer.open_safer(TEST_FILE.joinpath("unexists.txt"), "w", preserve=True)
+  assert list(tmp_path.iterdir()) == []
+
+  #メタデータの適用に失敗した場合、一時ファイルは削除され対象ファイルも置換されません。
+
+  def fchmod (fd, mode):
+    raise OSError(errno.EIO, os.strerror(errno.EIO))
+  monkeypatch.setattr(os, "fchmod", fchmod)
+
+  with pytest.raises(OSError):
+    with opensafer.open_safer(TEST_FILE, "w", preserve=True) as file:
+      file.write("123")
+  assert list(tmp_path.iterdir()) == []
+  with open(TEST_FILE, "r") as file:
+    assert file.read() == TEST_FILE_DATA